@@ -6,8 +6,10 @@
 # the 3-Clause BSD License.  See the LICENSE file in the package base
 # directory for details.
 
+import itertools
+from collections import defaultdict
 from enum import IntEnum, Enum
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, List, Tuple, Set, Optional, FrozenSet, Iterator, Iterable, DefaultDict
 
 import matplotlib.pyplot as plt
 import networkx as nx  # type:ignore
@@ -39,8 +41,8 @@ edge_props = [
 
 
 def parse_id(node_id: str) -> Tuple[int, int]:
-    split = node_id.split(':')
-    return int(split[0]), int(split[1])
+    file_id, _, line = node_id.partition(':')
+    return int(file_id), int(line)
 
 
 class EdgeType(Enum):
@@ -63,20 +65,31 @@ class NodeType(IntEnum):
 
 
 class Dependency:
+    __slots__ = ('etype', 'dtype', 'var_name', 'source', 'sink')
+
     etype: EdgeType
-    dtype: Optional[DepType] = None
-    var_name: Optional[str] = None
-    source: Optional[str] = None
-    sink: Optional[str] = None
+    dtype: Optional[DepType]
+    var_name: Optional[str]
+    source: Optional[str]
+    sink: Optional[str]
 
     def __init__(self, type: EdgeType):
         self.etype = type
+        self.dtype = None
+        self.var_name = None
+        self.source = None
+        self.sink = None
 
     def __str__(self):
         return self.var_name if self.var_name is not None else str(self.etype)
 
 
 class CUNode:
+    __slots__ = ('id', 'file_id', 'node_id', 'source_file', 'start_line', 'end_line', 'type', 'name',
+                 'instructions_count', 'loop_iterations', 'reduction', 'do_all', 'geometric_decomposition',
+                 'pipeline', 'local_vars', 'global_vars', 'args', 'tp_contains_task', 'tp_contains_taskwait',
+                 'tp_omittable', '_start_position', '_end_position')
+
     id: str
     file_id: int
     node_id: int
@@ -85,22 +98,38 @@ class CUNode:
     end_line: int
     type: NodeType
     name: str
-    instructions_count: int = -1
-    loop_iterations: int = -1
-    reduction: bool = False
-    do_all: bool = False
-    geometric_decomposition: bool = False
-    pipeline: float = -1
-    local_vars: List[Variable] = []
-    global_vars: List[Variable] = []
-    args: List[Variable] = []
-    tp_contains_task: bool = False
-    tp_contains_taskwait: bool = False
-    tp_omittable: bool = False
+    instructions_count: int
+    loop_iterations: int
+    reduction: bool
+    do_all: bool
+    geometric_decomposition: bool
+    pipeline: float
+    local_vars: List[Variable]
+    global_vars: List[Variable]
+    args: List[Variable]
+    tp_contains_task: bool
+    tp_contains_taskwait: bool
+    tp_omittable: bool
+    _start_position: Optional[str]
+    _end_position: Optional[str]
 
     def __init__(self, node_id: str):
         self.id = node_id
+        self._start_position = None
+        self._end_position = None
         self.file_id, self.node_id = parse_id(node_id)
+        self.instructions_count = -1
+        self.loop_iterations = -1
+        self.reduction = False
+        self.do_all = False
+        self.geometric_decomposition = False
+        self.pipeline = -1
+        self.local_vars = []
+        self.global_vars = []
+        self.args = []
+        self.tp_contains_task = False
+        self.tp_contains_taskwait = False
+        self.tp_omittable = False
 
     def start_position(self) -> str:
         """Start position file_id:line
@@ -108,7 +137,9 @@ class CUNode:
 
         :return:
         """
-        return f'{self.source_file}:{self.start_line}'
+        if self._start_position is None:
+            self._start_position = f'{self.source_file}:{self.start_line}'
+        return self._start_position
 
     def end_position(self) -> str:
         """End position file_id:line
@@ -116,7 +147,9 @@ class CUNode:
 
         :return:
         """
-        return f'{self.source_file}:{self.end_line}'
+        if self._end_position is None:
+            self._end_position = f'{self.source_file}:{self.end_line}'
+        return self._end_position
 
     def __str__(self):
         return self.id
@@ -128,7 +161,7 @@ class CUNode:
             return False
 
     def __hash__(self):
-        return hash(id)
+        return hash(self.id)
 
 
 def parse_cu(node: ObjectifiedElement) -> CUNode:
@@ -163,60 +196,126 @@ def parse_dependency(dep) -> Dependency:
 
 
 class PETGraphX(object):
-    g: nx.MultiDiGraph
     reduction_vars: List[Dict[str, str]]
     main: CUNode
+    _reduction_index: FrozenSet[Tuple[str, str]]
+    _pos: Optional[Dict[str, Tuple[float, float]]]
+    _subtree_cache: Dict[Tuple[str, NodeType], List[CUNode]]
+    _children_cache: Dict[Tuple[str, Optional[NodeType]], List[CUNode]]
+    _written_vars_cache: Dict[str, FrozenSet[Optional[str]]]
+    _loop_index_cache: Dict[str, FrozenSet[Optional[str]]]
+    _path_cache: Dict[Tuple[str, str], List[CUNode]]
+    _nodes_of_type_cache: Dict[NodeType, List[CUNode]]
+    _dependency_ids_cache: Dict[Tuple[str, str], FrozenSet[str]]
+    _cu_ids_cache: Dict[str, FrozenSet[str]]
+    _nodes: Dict[str, CUNode]
+    _out_edges: Dict[EdgeType, DefaultDict[str, List[Tuple[str, str, Dependency]]]]
+    _in_edges: Dict[EdgeType, DefaultDict[str, List[Tuple[str, str, Dependency]]]]
+    _self_raw_deps: DefaultDict[Optional[str], List[Tuple[str, str, Dependency]]]
+    _raw_out_edges: DefaultDict[str, List[Tuple[str, str, Dependency]]]
 
     def __init__(self, cu_dict: Dict[str, ObjectifiedElement], dependencies_list: List[DependenceItem],
                  loop_data: Dict[str, int], reduction_vars: List[Dict[str, str]]):
-        self.g = nx.MultiDiGraph()
+        self._nodes = {}
+        self._out_edges = {t: defaultdict(list) for t in EdgeType}
+        self._in_edges = {t: defaultdict(list) for t in EdgeType}
+        self._self_raw_deps = defaultdict(list)
+        self._raw_out_edges = defaultdict(list)
         self.reduction_vars = reduction_vars
+        self._reduction_index = frozenset((rv['loop_line'], rv['name']) for rv in reduction_vars or ())
+        self._subtree_cache = {}
+        self._children_cache = {}
+        self._written_vars_cache = {}
+        self._loop_index_cache = {}
+        self._path_cache = {}
+        self._nodes_of_type_cache = {}
+        self._dependency_ids_cache = {}
+        self._cu_ids_cache = {}
+        self._pos = None
 
         for id, node in cu_dict.items():
             n = parse_cu(node)
             if n.name == "main":
                 self.main = n
-            self.g.add_node(id, data=n)
+            self._nodes[id] = n
 
         for node in self.all_nodes(NodeType.LOOP):
             node.loop_iterations = loop_data.get(node.start_position(), 0)
 
         for node_id, node in cu_dict.items():
             source = node_id
-            if 'childrenNodes' in dir(node):
+            if hasattr(node, 'childrenNodes'):
                 for child in [n.text for n in node.childrenNodes]:
-                    if child not in self.g:
+                    if child not in self._nodes:
                         print(f"WARNING: no child node {child} found")
-                    self.g.add_edge(source, child, data=Dependency(EdgeType.CHILD))
-            if 'successors' in dir(node) and 'CU' in dir(node.successors):
+                    self.__add_edge(source, child, Dependency(EdgeType.CHILD))
+            if hasattr(node, 'successors') and hasattr(node.successors, 'CU'):
                 for successor in [n.text for n in node.successors.CU]:
-                    if successor not in self.g:
+                    if successor not in self._nodes:
                         print(f"WARNING: no successor node {successor} found")
-                    self.g.add_edge(source, successor, data=Dependency(EdgeType.SUCCESSOR))
-
-        # calculate position before dependencies affect them
-        try:
-            self.pos = nx.planar_layout(self.g)  # good
-        except nx.exception.NetworkXException:
-            try:
-                # fallback layouts
-                self.pos = nx.shell_layout(self.g)  # maybe
-                # self.pos = nx.kamada_kawai_layout(self.graph) # maybe
-            except nx.exception.NetworkXException:
-                self.pos = nx.random_layout(self.g)
+                    self.__add_edge(source, successor, Dependency(EdgeType.SUCCESSOR))
 
         for dep in dependencies_list:
             if dep.type == 'INIT':
                 continue
 
-            sink_cu_ids = readlineToCUIdMap[dep.sink]
-            source_cu_ids = writelineToCUIdMap[dep.source]
-            for sink_cu_id in sink_cu_ids:
-                for source_cu_id in source_cu_ids:
-                    if sink_cu_id == source_cu_id and (dep.type == 'WAR' or dep.type == 'WAW'):
-                        continue
-                    elif sink_cu_id and source_cu_id:
-                        self.g.add_edge(sink_cu_id, source_cu_id, data=parse_dependency(dep))
+            # the dependency is shared by all edges created from it
+            dependency = parse_dependency(dep)
+            skip_self_edges = dep.type == 'WAR' or dep.type == 'WAW'
+            for sink_cu_id, source_cu_id in itertools.product(readlineToCUIdMap.get(dep.sink, ()),
+                                                              writelineToCUIdMap.get(dep.source, ())):
+                if sink_cu_id == source_cu_id and skip_self_edges:
+                    continue
+                elif sink_cu_id and source_cu_id:
+                    self.__add_edge(sink_cu_id, source_cu_id, dependency)
+
+    def __add_edge(self, source: str, target: str, dep: Dependency):
+        """Adds edge to the outgoing edges of source and incoming edges of target, bucketed by edge type
+
+        :param source: id of the source node
+        :param target: id of the target node
+        :param dep: edge data
+        """
+        edge = (source, target, dep)
+        self._out_edges[dep.etype][source].append(edge)
+        self._in_edges[dep.etype][target].append(edge)
+        if dep.dtype == DepType.RAW:
+            self._raw_out_edges[source].append(edge)
+            if dep.sink == dep.source:
+                self._self_raw_deps[dep.var_name].append(edge)
+
+    def __to_networkx(self, etypes: List[EdgeType]) -> nx.MultiDiGraph:
+        """Builds NetworkX representation of the graph for plotting
+
+        :param etypes: types of edges to include
+        :return: graph with node ids as nodes and edge data as 'data' attribute
+        """
+        g = nx.MultiDiGraph()
+        for node_id, node in self._nodes.items():
+            g.add_node(node_id, data=node)
+        for etype in etypes:
+            for edges in self._out_edges[etype].values():
+                g.add_edges_from((s, t, {'data': d}) for s, t, d in edges)
+        return g
+
+    def __layout(self) -> Dict[str, Tuple[float, float]]:
+        """Calculates node positions for plotting, the result is cached
+
+        :return: position of every node
+        """
+        if self._pos is None:
+            # calculate position before dependencies affect them
+            g = self.__to_networkx([EdgeType.CHILD, EdgeType.SUCCESSOR])
+            try:
+                self._pos = nx.planar_layout(g)  # good
+            except nx.exception.NetworkXException:
+                try:
+                    # fallback layouts
+                    self._pos = nx.shell_layout(g)  # maybe
+                    # self._pos = nx.kamada_kawai_layout(g) # maybe
+                except nx.exception.NetworkXException:
+                    self._pos = nx.random_layout(g)
+        return self._pos
 
     def show(self):
         """Plots the graph
@@ -225,112 +324,180 @@ class PETGraphX(object):
         """
         print("showing")
         plt.plot()
-        pos = self.pos
+        pos = self.__layout()
+        g = self.__to_networkx(list(EdgeType))
 
         # draw nodes
-        nx.draw_networkx_nodes(self.g, pos=pos, node_color='#2B85FD', node_shape='o',
-                               nodelist=[n for n in self.g.nodes if self.node_at(n).type == NodeType.CU])
-        nx.draw_networkx_nodes(self.g, pos=pos, node_color='#ff5151', node_shape='d',
-                               nodelist=[n for n in self.g.nodes if self.node_at(n).type == NodeType.LOOP])
-        nx.draw_networkx_nodes(self.g, pos=pos, node_color='grey', node_shape='s',
-                               nodelist=[n for n in self.g.nodes if self.node_at(n).type == NodeType.DUMMY])
-        nx.draw_networkx_nodes(self.g, pos=pos, node_color='#cf65ff', node_shape='s',
-                               nodelist=[n for n in self.g.nodes if self.node_at(n).type == NodeType.FUNC])
-        nx.draw_networkx_nodes(self.g, pos=pos, node_color='yellow', node_shape='h', node_size=750,
-                               nodelist=[n for n in self.g.nodes if self.node_at(n).name == 'main'])
+        nx.draw_networkx_nodes(g, pos=pos, node_color='#2B85FD', node_shape='o',
+                               nodelist=[n for n in g.nodes if self.node_at(n).type == NodeType.CU])
+        nx.draw_networkx_nodes(g, pos=pos, node_color='#ff5151', node_shape='d',
+                               nodelist=[n for n in g.nodes if self.node_at(n).type == NodeType.LOOP])
+        nx.draw_networkx_nodes(g, pos=pos, node_color='grey', node_shape='s',
+                               nodelist=[n for n in g.nodes if self.node_at(n).type == NodeType.DUMMY])
+        nx.draw_networkx_nodes(g, pos=pos, node_color='#cf65ff', node_shape='s',
+                               nodelist=[n for n in g.nodes if self.node_at(n).type == NodeType.FUNC])
+        nx.draw_networkx_nodes(g, pos=pos, node_color='yellow', node_shape='h', node_size=750,
+                               nodelist=[n for n in g.nodes if self.node_at(n).name == 'main'])
         # id as label
         labels = {}
-        for n in self.g.nodes:
-            labels[n] = str(self.g.nodes[n]['data'])
-        nx.draw_networkx_labels(self.g, pos, labels, font_size=10)
-
-        nx.draw_networkx_edges(self.g, pos,
-                               edgelist=[e for e in self.g.edges(data='data') if e[2].etype == EdgeType.CHILD])
-        nx.draw_networkx_edges(self.g, pos, edge_color='green',
-                               edgelist=[e for e in self.g.edges(data='data') if e[2].etype == EdgeType.SUCCESSOR])
-        nx.draw_networkx_edges(self.g, pos, edge_color='red',
-                               edgelist=[e for e in self.g.edges(data='data') if e[2].etype == EdgeType.DATA])
+        for n in g.nodes:
+            labels[n] = str(g.nodes[n]['data'])
+        nx.draw_networkx_labels(g, pos, labels, font_size=10)
+
+        nx.draw_networkx_edges(g, pos,
+                               edgelist=[e for e in g.edges(data='data') if e[2].etype == EdgeType.CHILD])
+        nx.draw_networkx_edges(g, pos, edge_color='green',
+                               edgelist=[e for e in g.edges(data='data') if e[2].etype == EdgeType.SUCCESSOR])
+        nx.draw_networkx_edges(g, pos, edge_color='red',
+                               edgelist=[e for e in g.edges(data='data') if e[2].etype == EdgeType.DATA])
         plt.show()
         # plt.savefig('graphX.svg')
 
+    def __invalidate_caches(self):
+        """Drops all memoized query results, must be called by every method that modifies the graph
+        """
+        self._subtree_cache.clear()
+        self._children_cache.clear()
+        self._written_vars_cache.clear()
+        self._loop_index_cache.clear()
+        self._path_cache.clear()
+        self._nodes_of_type_cache.clear()
+        self._dependency_ids_cache.clear()
+        self._cu_ids_cache.clear()
+
+    def remove_nodes(self, node_ids: Iterable[str]):
+        """Removes nodes and all their edges from the graph
+        Adjacency lists of the neighbours are filtered once for all removed nodes
+
+        :param node_ids: ids of the nodes
+        """
+        removed = set(node_ids)
+        for node_id in removed:
+            del self._nodes[node_id]
+        self.__invalidate_caches()
+
+        raw_sources = {s for node_id in removed for s, t, d in self._in_edges[EdgeType.DATA].get(node_id, [])
+                       if d.dtype == DepType.RAW}
+        for s in raw_sources - removed:
+            self._raw_out_edges[s] = [e for e in self._raw_out_edges[s] if e[1] not in removed]
+        for node_id in removed:
+            self._raw_out_edges.pop(node_id, None)
+
+        for etype in EdgeType:
+            out_edges = self._out_edges[etype]
+            in_edges = self._in_edges[etype]
+            targets = {t for node_id in removed for s, t, d in out_edges.pop(node_id, [])}
+            sources = {s for node_id in removed for s, t, d in in_edges.pop(node_id, [])}
+            for t in targets - removed:
+                in_edges[t] = [e for e in in_edges[t] if e[0] not in removed]
+            for s in sources - removed:
+                out_edges[s] = [e for e in out_edges[s] if e[1] not in removed]
+
+        for var_name, deps in self._self_raw_deps.items():
+            self._self_raw_deps[var_name] = [e for e in deps if e[0] not in removed and e[1] not in removed]
+
     def node_at(self, node_id: str) -> CUNode:
         """Gets node data by node id
 
         :param node_id: id of the node
         :return: Node
         """
-        return self.g.nodes[node_id]['data']
+        return self._nodes[node_id]
 
     def all_nodes(self, type: NodeType = None) -> List[CUNode]:
         """List of all nodes of specified type
+        Results are cached per type, the returned list must not be modified
 
         :param type: type of node
         :return: List of all nodes
         """
-        return [n[1] for n in self.g.nodes(data='data') if type is None or n[1].type == type]
+        if type is None:
+            return list(self._nodes.values())
+        if type not in self._nodes_of_type_cache:
+            self._nodes_of_type_cache[type] = [n for n in self._nodes.values() if n.type == type]
+        return self._nodes_of_type_cache[type]
 
     def out_edges(self, node_id: str, etype: EdgeType = None) -> List[Tuple[str, str, Dependency]]:
         """Get outgoing edges of node of specified type
+        For a single edge type the internal adjacency list is returned, it must not be modified
 
         :param node_id: id of the source node
         :param etype: type of edges
         :return: list of outgoing edges
         """
-        return [t for t in self.g.out_edges(node_id, data='data') if etype is None or t[2].etype == etype]
+        if etype is not None:
+            return self._out_edges[etype].get(node_id, [])
+        return [e for t in EdgeType for e in self._out_edges[t].get(node_id, [])]
 
     def in_edges(self, node_id: str, etype: EdgeType = None) -> List[Tuple[str, str, Dependency]]:
         """Get incoming edges of node of specified type
+        For a single edge type the internal adjacency list is returned, it must not be modified
 
         :param node_id: id of the target node
         :param etype: type of edges
         :return: list of incoming edges
         """
-        return [t for t in self.g.in_edges(node_id, data='data') if etype is None or t[2].etype == etype]
+        if etype is not None:
+            return self._in_edges[etype].get(node_id, [])
+        return [e for t in EdgeType for e in self._in_edges[t].get(node_id, [])]
 
     def subtree_of_type(self, root: CUNode, type: NodeType) -> List[CUNode]:
         """Gets all nodes in subtree of specified type including root
+        Results are cached per (root, type), the returned list must not be modified
 
         :param root: root node
         :param type: type of children
         :return: list of nodes in subtree
         """
-        return self.__subtree_of_type_rec(root, type, set())
+        key = (root.id, type)
+        if key not in self._subtree_cache:
+            self._subtree_cache[key] = list(self.iter_subtree_of_type(root, type))
+        return self._subtree_cache[key]
 
-    def __subtree_of_type_rec(self, root: CUNode, type: NodeType, visited: Set[CUNode]) -> List[CUNode]:
-        """Gets all nodes in subtree of specified type including root
+    def iter_subtree_of_type(self, root: CUNode, type: NodeType) -> Iterator[CUNode]:
+        """Lazily traverses the subtree in depth-first pre-order and yields nodes of specified type including root
 
         :param root: root node
         :param type: type of children
-        :param visited: set of visited nodes
-        :return: list of nodes in subtree
+        :return: iterator over nodes in subtree
         """
-        res: List[CUNode] = []
-        if root in visited:
-            return res
-        visited.add(root)
-        if root.type == type:
-            res.append(root)
-        for s, t, e in self.out_edges(root.id, EdgeType.CHILD):
-            res.extend(self.__subtree_of_type_rec(self.node_at(t), type, visited))
-        return res
+        visited: Set[str] = set()
+        stack: List[CUNode] = [root]
+        while stack:
+            current = stack.pop()
+            if current.id in visited:
+                continue
+            visited.add(current.id)
+            if current.type == type:
+                yield current
+            # reversed to preserve depth-first pre-order of children
+            stack.extend(self.node_at(t) for s, t, e in reversed(self.out_edges(current.id, EdgeType.CHILD)))
 
     def direct_children(self, root: CUNode) -> List[CUNode]:
         """Gets only direct children of any type
+        Results are cached per root, the returned list must not be modified
 
         :param root: root node
         :return: list of direct children
         """
-        return [self.node_at(t) for s, t, d in self.out_edges(root.id, EdgeType.CHILD)]
+        key = (root.id, None)
+        if key not in self._children_cache:
+            self._children_cache[key] = [self.node_at(t) for s, t, d in self.out_edges(root.id, EdgeType.CHILD)]
+        return self._children_cache[key]
 
     def direct_children_of_type(self, root: CUNode, type: NodeType) -> List[CUNode]:
         """Gets only direct children of specified type
+        Results are cached per (root, type), the returned list must not be modified
 
         :param root: root node
         :param type: type of children
         :return: list of direct children
         """
-        return [self.node_at(t) for s, t, d in self.out_edges(root.id, EdgeType.CHILD)
-                if self.node_at(t).type == type]
+        key = (root.id, type)
+        if key not in self._children_cache:
+            self._children_cache[key] = [self.node_at(t) for s, t, d in self.out_edges(root.id, EdgeType.CHILD)
+                                         if self.node_at(t).type == type]
+        return self._children_cache[key]
 
     def is_reduction_var(self, line: str, name: str) -> bool:
         """Determines, whether or not the given variable is reduction variable
@@ -339,7 +506,7 @@ class PETGraphX(object):
         :param name: variable name
         :return: true if is reduction variable
         """
-        return any(rv for rv in self.reduction_vars if rv['loop_line'] == line and rv['name'] == name)
+        return (line, name) in self._reduction_index
 
     def depends_ignore_readonly(self, source: CUNode, target: CUNode, root_loop: CUNode) -> bool:
         """Detects if source node or one of it's children has a RAW dependency to target node or one of it's children
@@ -350,13 +517,31 @@ class PETGraphX(object):
         :param root_loop: root loop
         :return: true, if there is RAW dependency
         """
-        children = self.subtree_of_type(target, NodeType.CU)
         # TODO children.append(target)
+        return not self.get_all_dependency_ids(source, root_loop).isdisjoint(self.__cu_ids(target))
 
-        for dep in self.get_all_dependencies(source, root_loop):
-            if dep in children:
-                return True
-        return False
+    def __cu_ids(self, root: CUNode) -> FrozenSet[str]:
+        """Ids of all CU nodes in the subtree, the result is cached
+
+        :param root: root node
+        :return: ids of CU nodes in subtree
+        """
+        if root.id not in self._cu_ids_cache:
+            self._cu_ids_cache[root.id] = frozenset(c.id for c in self.subtree_of_type(root, NodeType.CU))
+        return self._cu_ids_cache[root.id]
+
+    def get_all_dependency_ids(self, node: CUNode, root_loop: CUNode) -> FrozenSet[str]:
+        """Ids of all data dependency targets of the node and it's children, the result is cached per root loop
+        This method ignores loop index and read only variables
+
+        :param node: node
+        :param root_loop: root loop
+        :return: ids of targets of RAW dependencies of the node
+        """
+        key = (node.id, root_loop.id)
+        if key not in self._dependency_ids_cache:
+            self._dependency_ids_cache[key] = frozenset(dep.id for dep in self.__iter_all_dependencies(node, root_loop))
+        return self._dependency_ids_cache[key]
 
     def get_all_dependencies(self, node: CUNode, root_loop: CUNode) -> Set[CUNode]:
         """Returns all data dependencies of the node and it's children
@@ -366,19 +551,26 @@ class PETGraphX(object):
         :param root_loop: root loop
         :return: list of all RAW dependencies of the node
         """
-        dep_set = set()
+        return {self.node_at(t) for t in self.get_all_dependency_ids(node, root_loop)}
+
+    def __iter_all_dependencies(self, node: CUNode, root_loop: CUNode) -> Iterator[CUNode]:
+        """Lazily yields targets of data dependencies of the node and it's children, may contain duplicates
+        This method ignores loop index and read only variables
+
+        :param node: node
+        :param root_loop: root loop
+        :return: iterator over targets of RAW dependencies of the node
+        """
         children = self.subtree_of_type(node, NodeType.CU)
 
-        loops_start_lines = [v.start_position() for v in self.subtree_of_type(root_loop, NodeType.LOOP)]
+        # for a fixed root loop both checks only depend on the variable and are cached per loop
+        loop_indices = self.loop_index_vars(root_loop)
+        written_vars = self.written_vars_inside_loop_body(root_loop)
 
         for v in children:
-            for t, d in [(t, d) for s, t, d in self.out_edges(v.id, EdgeType.DATA) if d.dtype == DepType.RAW]:
-                if (self.is_loop_index(d.var_name, loops_start_lines, self.subtree_of_type(root_loop, NodeType.CU))
-                        or self.is_readonly_inside_loop_body(d, root_loop)):
-                    continue
-                dep_set.add(self.node_at(t))
-
-        return dep_set
+            for s, t, d in self._raw_out_edges.get(v.id, []):
+                if d.var_name not in loop_indices and d.var_name in written_vars:
+                    yield self.node_at(t)
 
     def is_loop_index(self, var_name: Optional[str], loops_start_lines: List[str], children: List[CUNode]) -> bool:
         """Checks, whether the variable is a loop index.
@@ -391,44 +583,56 @@ class PETGraphX(object):
 
         # If there is a raw dependency for var, the source cu is part of the loop
         # and the dependency occurs in loop header, then var is loop index+
+        children_ids = {c.id for c in children}
 
-        for c in children:
-            for t, d in [(t, d) for s, t, d in self.out_edges(c.id, EdgeType.DATA)
-                         if d.dtype == DepType.RAW and d.var_name == var_name]:
-                if (d.sink == d.source
-                        and d.source in loops_start_lines
-                        and self.node_at(t) in children):
-                    return True
+        for s, t, d in self._self_raw_deps.get(var_name, []):
+            if (d.source in loops_start_lines
+                    and s in children_ids
+                    and t in children_ids):
+                return True
 
         return False
 
-    def is_readonly_inside_loop_body(self, dep: Dependency, root_loop: CUNode) -> bool:
-        """Checks, whether a variable is read-only in loop body
+    def loop_index_vars(self, root_loop: CUNode) -> FrozenSet[Optional[str]]:
+        """Collects loop indices of the loop and it's subloops. The result is cached per loop
 
-        :param dep: dependency variable
         :param root_loop: root loop
-        :return: true if variable is read-only in loop body
+        :return: names of variables for which is_loop_index holds inside the loop
         """
-        # TODO pass as param?
-        loops_start_lines = [v.start_position() for v in self.subtree_of_type(root_loop, NodeType.LOOP)]
-        children = self.subtree_of_type(root_loop, NodeType.CU)
+        if root_loop.id not in self._loop_index_cache:
+            loops_start_lines = {v.start_position() for v in self.subtree_of_type(root_loop, NodeType.LOOP)}
+            children_ids = self.__cu_ids(root_loop)
 
-        for v in children:
-            for t, d in [(t, d) for s, t, d in self.out_edges(v.id, EdgeType.DATA)
-                         if d.dtype == DepType.WAR or d.dtype == DepType.WAW]:
-                # If there is a waw dependency for var, then var is written in loop
-                # (sink is always inside loop for waw/war)
-                if (dep.var_name == d.var_name
-                        and not (d.sink in loops_start_lines)):
-                    return False
-            for t, d in [(t, d) for s, t, d in self.in_edges(v.id, EdgeType.DATA)
-                         if d.dtype == DepType.RAW]:
-                # If there is a reverse raw dependency for var, then var is written in loop
-                # (source is always inside loop for reverse raw)
-                if (dep.var_name == d.var_name
-                        and not (d.source in loops_start_lines)):
-                    return False
-        return True
+            # only the RAW edges leaving the loop's own CUs can mark a loop index
+            self._loop_index_cache[root_loop.id] = frozenset(
+                d.var_name for cid in children_ids for s, t, d in self._raw_out_edges.get(cid, [])
+                if d.sink == d.source and d.source in loops_start_lines and t in children_ids)
+        return self._loop_index_cache[root_loop.id]
+
+    def written_vars_inside_loop_body(self, root_loop: CUNode) -> FrozenSet[Optional[str]]:
+        """Collects variables, that are written in loop body. The result is cached per loop
+
+        :param root_loop: root loop
+        :return: names of written variables
+        """
+        if root_loop.id not in self._written_vars_cache:
+            loops_start_lines = {v.start_position() for v in self.subtree_of_type(root_loop, NodeType.LOOP)}
+            written: Set[Optional[str]] = set()
+
+            for v in self.subtree_of_type(root_loop, NodeType.CU):
+                for s, t, d in self.out_edges(v.id, EdgeType.DATA):
+                    # If there is a waw dependency for var, then var is written in loop
+                    # (sink is always inside loop for waw/war)
+                    if (d.dtype == DepType.WAR or d.dtype == DepType.WAW) and d.sink not in loops_start_lines:
+                        written.add(d.var_name)
+                for s, t, d in self.in_edges(v.id, EdgeType.DATA):
+                    # If there is a reverse raw dependency for var, then var is written in loop
+                    # (source is always inside loop for reverse raw)
+                    if d.dtype == DepType.RAW and d.source not in loops_start_lines:
+                        written.add(d.var_name)
+
+            self._written_vars_cache[root_loop.id] = frozenset(written)
+        return self._written_vars_cache[root_loop.id]
 
     def get_left_right_subtree(self, target: CUNode, right_subtree: bool) -> List[CUNode]:
         """Searches for all subnodes of main which are to the left or to the right of the specified node
@@ -439,20 +643,20 @@ class PETGraphX(object):
         """
         stack: List[CUNode] = [self.main]
         res: List[CUNode] = []
-        visited = []
+        visited: Set[str] = set()
 
         while stack:
             current = stack.pop()
 
-            if current == target:
+            if current.id == target.id:
                 return res
             if current.type == NodeType.CU:
                 res.append(current)
 
-            if current in visited:  # suppress looping
+            if current.id in visited:  # suppress looping
                 continue
             else:
-                visited.append(current)
+                visited.add(current.id)
 
             stack.extend(self.direct_children(current) if right_subtree
                          else reversed(self.direct_children(current)))
@@ -461,27 +665,41 @@ class PETGraphX(object):
 
     def path(self, source: CUNode, target: CUNode) -> List[CUNode]:
         """DFS from source to target over edges of child type
+        Results are cached per (source, target), the returned list must not be modified
 
         :param source: source node
         :param target: target node
         :return: list of nodes from source to target
         """
-        return self.__path_rec(source, target, set())
+        key = (source.id, target.id)
+        if key not in self._path_cache:
+            self._path_cache[key] = self.__path(source, target)
+        return self._path_cache[key]
 
-    def __path_rec(self, source: CUNode, target: CUNode, visited: Set[CUNode]) -> List[CUNode]:
+    def __path(self, source: CUNode, target: CUNode) -> List[CUNode]:
         """DFS from source to target over edges of child type
+        Iterative version of the recursive search, children are filtered when a node is entered
 
         :param source: source node
         :param target: target node
         :return: list of nodes from source to target
         """
-        visited.add(source)
-        if source == target:
+        visited = {source.id}
+        if source.id == target.id:
             return [source]
 
-        for child in [c for c in self.direct_children(source) if c not in visited]:
-            path = self.__path_rec(child, target, visited)
-            if path:
-                path.insert(0, source)
+        # path[i] is the node whose unexplored children are in stack[i]
+        path = [source]
+        stack = [iter([c for c in self.direct_children(source) if c.id not in visited])]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                path.pop()
+                continue
+            visited.add(child.id)
+            path.append(child)
+            if child.id == target.id:
                 return path
+            stack.append(iter([c for c in self.direct_children(child) if c.id not in visited]))
         return []
@@ -33,6 +33,13 @@ class PatternInfoSerializer(JSONEncoder):
     """
 
     def default(self, o):
+        if isinstance(o, Variable):
+            return o.name
+        if isinstance(o, (PatternInfo, DetectionResult, PipelineStage)):
+            return filter_members(o.__dict__)
+        if isinstance(o, CUNode):
+            return o.id
+
         try:
             iterable = iter(o)
         except TypeError:
@@ -40,16 +47,5 @@ class PatternInfoSerializer(JSONEncoder):
         else:
             return list(iterable)
 
-        if isinstance(o, Variable):
-            return o.name
-        if isinstance(o, PatternInfo):
-            return filter_members(o.__dict__)
-        if isinstance(o, DetectionResult):
-            return filter_members(o.__dict__)
-        if isinstance(o, PipelineStage):
-            return filter_members(o.__dict__)
-        if isinstance(o, CUNode):
-            return o.id
-
         # Let the base class default method raise the TypeError
         return JSONEncoder.default(self, o)
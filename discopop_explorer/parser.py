@@ -26,14 +26,16 @@ class DependenceItem(object):
 
 
 def __parse_xml_input(xml_fd):
-    xml_content = ""
-    for line in xml_fd.readlines():
+    # the file consists of several <Nodes> sections, which are merged into one document
+    # by feeding the lines to the parser incrementally instead of concatenating strings
+    xml_parser = objectify.makeparser(remove_blank_text=True)
+    xml_parser.feed("<Nodes>")
+    for line in xml_fd:
         if not (line.rstrip().endswith('</Nodes>') or line.rstrip().endswith('<Nodes>')):
-            xml_content = xml_content + line
+            xml_parser.feed(line)
+    xml_parser.feed("</Nodes>")
 
-    xml_content = "<Nodes>{0}</Nodes>".format(xml_content)
-
-    parsed_cu = objectify.fromstring(xml_content)
+    parsed_cu = xml_parser.close()
     cu_dict = dict()
     for node in parsed_cu.Node:
         node.childrenNodes = str(node.childrenNodes).split(',') if node.childrenNodes else []
@@ -57,7 +59,7 @@ def __map_dummy_nodes(cu_dict):
     for node_id, node in cu_dict.items():
         if node.get('type') == '3' or node.get('type') == '1':
             key = node.get('name')
-            if 'arg' in dir(node.funcArguments):
+            if hasattr(node.funcArguments, 'arg'):
                 for i in node.funcArguments.arg:
                     key = key + i.get('type')
                 if node.get('type') == '3':
@@ -75,13 +77,13 @@ def __map_dummy_nodes(cu_dict):
     # now go through all the nodes and update the mapped dummies to real funcs
     for node_id, node in cu_dict.items():
         # check dummy in all the children nodes
-        if 'childrenNodes' in dir(node):
+        if hasattr(node, 'childrenNodes'):
             for child_idx, child in enumerate(node.childrenNodes):
                 if child in dummy_to_func_ids_map:
                     cu_dict[node_id].childrenNodes[child_idx] = dummy_to_func_ids_map[child]
 
             # Also do the same in callLineToFunctionMap
-            if 'callsNode' in dir(node):
+            if hasattr(node, 'callsNode'):
                 for idx, i in enumerate(node.callsNode.nodeCalled):
                     if i in dummy_to_func_ids_map:
                         cu_dict[node_id].callsNode.nodeCalled[idx] = dummy_to_func_ids_map[i]
@@ -90,16 +92,15 @@ def __map_dummy_nodes(cu_dict):
 
 def __parse_dep_file(dep_fd):
     dependencies_list = []
-    for line in dep_fd.readlines():
+    for line in dep_fd:
         dep_fields = line.split()
         if len(dep_fields) < 4 or dep_fields[1] != "NOM":
             continue
         sink = dep_fields[0]
-        for dep_pair in list(zip(dep_fields[2:], dep_fields[3:]))[::2]:  # pairwise iteration over dependencies source
-            type = dep_pair[0]
-            source_fields = dep_pair[1].split('|')
-            var_str = "" if len(source_fields) == 1 else source_fields[1]
-            dependencies_list.append(DependenceItem(sink, source_fields[0], type, var_str))
+        for type, dep_source in zip(dep_fields[2::2], dep_fields[3::2]):  # pairwise iteration over dependencies
+            # source|var_name, the variable name is missing for some dependencies
+            source, _, var_str = dep_source.partition('|')
+            dependencies_list.append(DependenceItem(sink, source, type, var_str))
 
     return dependencies_list
 
@@ -113,34 +114,22 @@ def parse_inputs(cu_file, dependencies, loop_counter, reduction_file):
         dependencies = __parse_dep_file(f)
 
     if os.path.exists(loop_counter):
-        loop_data = {}
         with open(loop_counter) as f:
-            content = f.readlines()
-        for line in content:
-            s = line.split(' ')
-            # line = FileId + LineNr
-            loop_data[s[0] + ':' + s[1]] = int(s[2])
+            # line = FileId LineNr Count
+            loop_data = {f'{s[0]}:{s[1]}': int(s[2]) for s in (line.split(' ') for line in f)}
     else:
         loop_data = None
 
     if os.path.exists(reduction_file):
-        reduction_vars = []
-
         # parse reduction variables
         with open(reduction_file) as f:
-            content = f.readlines()
-
-        for line in content:
-            line = line.replace("\n", "")
-            s = line.split(' ')
             # line = FileId + LineNr
-            var = {
+            reduction_vars = [{
                 'loop_line': f'{s[3]}:{s[8]}',
                 'name': s[17],
                 'reduction_line': f'{s[3]}:{s[13]}',
                 'operation': s[21]
-            }
-            reduction_vars.append(var)
+            } for s in (line.replace("\n", "").split(' ') for line in f)]
     else:
         reduction_vars = None
 
@@ -52,8 +52,7 @@ class PatternDetectorX(object):
                     if remove_dummies and self.pet.node_at(t).type == NodeType.DUMMY:
                         dummies_to_remove.add(t)
 
-        for n in dummies_to_remove:
-            self.pet.g.remove_node(n)
+        self.pet.remove_nodes(dummies_to_remove)
 
     def detect_patterns(self):
         """Runs pattern discovery on the CU graph
@@ -5,7 +5,7 @@
 # This software may be modified and distributed under the terms of
 # the 3-Clause BSD License.  See the LICENSE file in the package base
 # directory for details.
-from typing import List
+from typing import List, Set
 
 from .PatternInfo import PatternInfo
 from ..PETGraphX import PETGraphX, CUNode, NodeType, EdgeType
@@ -69,9 +69,12 @@ def __detect_do_all(pet: PETGraphX, root: CUNode) -> bool:
     """
     subnodes = [pet.node_at(t) for s, t, d in pet.out_edges(root.id, EdgeType.CHILD)]
 
-    for i in range(0, len(subnodes)):
-        for j in range(i, len(subnodes)):
-            if pet.depends_ignore_readonly(subnodes[i], subnodes[j], root):
-                return False
+    # a subnode must not depend on itself or on any of the subnodes after it,
+    # so its dependencies are checked against the CUs of all those subnodes at once
+    later_cu_ids: Set[str] = set()
+    for node in reversed(subnodes):
+        later_cu_ids.update(c.id for c in pet.subtree_of_type(node, NodeType.CU))
+        if not pet.get_all_dependency_ids(node, root).isdisjoint(later_cu_ids):
+            return False
 
     return True
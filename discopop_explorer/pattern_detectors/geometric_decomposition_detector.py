@@ -7,6 +7,7 @@
 # directory for details.
 
 
+import itertools
 import math
 from typing import Dict, List, Tuple, Optional
 
@@ -16,6 +17,7 @@ from ..utils import classify_task_vars, get_child_loops
 from ..variable import Variable
 
 __loop_iterations: Dict[str, int] = {}
+__parent_iterations: Dict[str, int] = {}
 
 
 class GDInfo(PatternInfo):
@@ -32,18 +34,7 @@ class GDInfo(PatternInfo):
         self.do_all_children, self.reduction_children = get_child_loops(pet, node)
 
         self.min_iter_number = min_iter
-        mi_sqrt = math.sqrt(min_iter)
-        wl = math.sqrt(self.workload)
-        nt = 1.1 * mi_sqrt + 0.0002 * wl - 0.0000002 * mi_sqrt * wl - 10
-
-        if nt >= 1000:
-            self.num_tasks = math.floor(nt / 100) * 100
-        elif nt >= 100:
-            self.num_tasks = math.floor(nt / 10) * 10
-        elif nt < 0:
-            self.num_tasks = 2
-        else:
-            self.num_tasks = math.floor(nt)
+        self.num_tasks = self._compute_num_tasks(min_iter, self.workload)
 
         self.pragma = "for (i = 0; i < num-tasks; i++) #pragma omp task"
         lp: List = []
@@ -56,6 +47,24 @@ class GDInfo(PatternInfo):
         self.shared = s
         self.reduction = r
 
+    @staticmethod
+    def _compute_num_tasks(min_iter: int, workload: float) -> int:
+        """Estimates the number of tasks
+        Values below 100 are rounded down to ones, below 1000 to tens, otherwise to hundreds
+
+        :param min_iter: minimal number of iterations of the inner loops
+        :param workload: workload of the node
+        :return: number of tasks, 2 if the estimation is negative
+        """
+        mi_sqrt = math.sqrt(min_iter)
+        wl = math.sqrt(workload)
+        nt = 1.1 * mi_sqrt + 0.0002 * wl - 0.0000002 * mi_sqrt * wl - 10
+
+        if nt < 0:
+            return 2
+        step = 10 ** min(2, max(0, int(math.log10(max(math.floor(nt), 1))) - 1))
+        return math.floor(nt / step) * step
+
     def __str__(self):
         return f'Geometric decomposition at: {self.node_id}\n' \
                f'Start line: {self.start_line}\n' \
@@ -81,7 +90,9 @@ def run_detection(pet: PETGraphX) -> List[GDInfo]:
     """
     result = []
     global __loop_iterations
+    global __parent_iterations
     __loop_iterations = {}
+    __parent_iterations = {}
     for node in pet.all_nodes(NodeType.FUNC):
         if __detect_geometric_decomposition(pet, node):
             node.geometric_decomposition = True
@@ -100,20 +111,13 @@ def __test_chunk_limit(pet: PETGraphX, node: CUNode) -> Tuple[bool, Optional[int
     :param node: the node
     :return: true if node satisfies condition, min iteration number
     """
-    min_iterations_count = None
-    inner_loop_iter = {}
-
-    children = pet.direct_children_of_type(node, NodeType.LOOP)
-
-    for func_child in pet.direct_children_of_type(node, NodeType.FUNC):
-        children.extend(pet.direct_children_of_type(func_child, NodeType.LOOP))
+    children = itertools.chain(pet.direct_children_of_type(node, NodeType.LOOP),
+                               (loop for func_child in pet.direct_children_of_type(node, NodeType.FUNC)
+                                for loop in pet.direct_children_of_type(func_child, NodeType.LOOP)))
 
-    for child in children:
-        inner_loop_iter[child.start_position()] = __iterations_count(pet, child)
+    inner_loop_iter = {child.start_position(): __iterations_count(pet, child) for child in children}
 
-    for k, v in inner_loop_iter.items():
-        if min_iterations_count is None or v < min_iterations_count:
-            min_iterations_count = v
+    min_iterations_count = min(inner_loop_iter.values(), default=None)
     return bool(inner_loop_iter) and (min_iterations_count is None or min_iterations_count > 0), min_iterations_count
 
 
@@ -124,7 +128,7 @@ def __iterations_count(pet: PETGraphX, node: CUNode) -> int:
     :param node: the loop node
     :return: number of iterations
     """
-    if not (node in __loop_iterations):
+    if node.id not in __loop_iterations:
         loop_iter = node.loop_iterations
         parent_iter = __get_parent_iterations(pet, node)
 
@@ -145,6 +149,11 @@ def __get_parent_iterations(pet: PETGraphX, node: CUNode) -> int:
     :param node: current node
     :return: number of iterations
     """
+    if node.id in __parent_iterations:
+        return __parent_iterations[node.id]
+
+    # every non-loop node on the way up shares the result, so it is cached for all of them
+    visited = [node.id]
     parent = pet.in_edges(node.id, EdgeType.CHILD)
 
     max_iter = 1
@@ -153,8 +162,14 @@ def __get_parent_iterations(pet: PETGraphX, node: CUNode) -> int:
         if node.type == NodeType.LOOP:
             max_iter = max(1, node.loop_iterations)
             break
+        if node.id in __parent_iterations:
+            max_iter = __parent_iterations[node.id]
+            break
+        visited.append(node.id)
         parent = pet.in_edges(node.id, EdgeType.CHILD)
 
+    for node_id in visited:
+        __parent_iterations[node_id] = max_iter
     return max_iter
 
 
@@ -165,13 +180,8 @@ def __detect_geometric_decomposition(pet: PETGraphX, root: CUNode) -> bool:
     :param root: root node
     :return: true if GD pattern was discovered
     """
-    for child in pet.subtree_of_type(root, NodeType.LOOP):
-        if not (child.reduction or child.do_all):
-            return False
-
-    for child in pet.direct_children_of_type(root, NodeType.FUNC):
-        for child2 in pet.direct_children_of_type(child, NodeType.LOOP):
-            if not (child2.reduction or child2.do_all):
-                return False
+    func_child_loops = (loop for func_child in pet.direct_children_of_type(root, NodeType.FUNC)
+                        for loop in pet.direct_children_of_type(func_child, NodeType.LOOP))
 
-    return True
+    return all(child.reduction or child.do_all
+               for child in itertools.chain(pet.subtree_of_type(root, NodeType.LOOP), func_child_loops))
@@ -7,7 +7,9 @@
 # directory for details.
 
 
-from typing import List, Tuple
+from typing import List, Set, Tuple
+
+import numpy as np
 
 from .PatternInfo import PatternInfo
 from ..PETGraphX import PETGraphX, NodeType, CUNode, EdgeType, DepType, Dependency
@@ -60,10 +62,7 @@ class PipelineInfo(PatternInfo):
         self._pet = pet
         self.coefficient = round(node.pipeline, 3)
 
-        children_start_lines = [v.start_position() for v in pet.subtree_of_type(node, NodeType.LOOP)]
-
-        self._stages = [pet.node_at(t) for s, t, d in pet.out_edges(node.id, EdgeType.CHILD)
-                        if is_pipeline_subnode(node, pet.node_at(t), children_start_lines)]
+        self._stages = get_pipeline_subnodes(pet, node)
 
         self.stages = [self.__output_stage(s) for s in self._stages]
 
@@ -72,22 +71,22 @@ class PipelineInfo(PatternInfo):
         for n in self._pet.subtree_of_type(node, NodeType.CU):
             raw.extend((s, t, d) for s, t, d in self._pet.out_edges(n.id, EdgeType.DATA) if d.dtype == DepType.RAW)
 
-        nodes_before = [node]
+        nodes_before = {node.id}
         for i in range(self._stages.index(node)):
-            nodes_before.extend(self._pet.subtree_of_type(self._stages[i], NodeType.CU))
+            nodes_before.update(n.id for n in self._pet.subtree_of_type(self._stages[i], NodeType.CU))
 
-        return [dep for dep in raw if dep[1] in [n.id for n in nodes_before]]
+        return [dep for dep in raw if dep[1] in nodes_before]
 
     def __out_dep(self, node: CUNode):
         raw: List[Tuple[str, str, Dependency]] = []
         for n in self._pet.subtree_of_type(node, NodeType.CU):
             raw.extend((s, t, d) for s, t, d in self._pet.in_edges(n.id, EdgeType.DATA) if d.dtype == DepType.RAW)
 
-        nodes_after = [node]
+        nodes_after = {node.id}
         for i in range(self._stages.index(node) + 1, len(self._stages)):
-            nodes_after.extend(self._pet.subtree_of_type(self._stages[i], NodeType.CU))
+            nodes_after.update(n.id for n in self._pet.subtree_of_type(self._stages[i], NodeType.CU))
 
-        return [dep for dep in raw if dep[0] in [n.id for n in nodes_after]]
+        return [dep for dep in raw if dep[0] in nodes_after]
 
     def __output_stage(self, node: CUNode) -> PipelineStage:
         in_d = self.__in_dep(node)
@@ -104,7 +103,18 @@ class PipelineInfo(PatternInfo):
                f'Stages:\n{s}'
 
 
-def is_pipeline_subnode(root: CUNode, current: CUNode, children_start_lines: List[str]) -> bool:
+def get_pipeline_subnodes(pet: PETGraphX, root: CUNode) -> List[CUNode]:
+    """Children of the root, that are valid subnodes for pipeline
+
+    :param pet: PET graph
+    :param root: root node
+    :return: list of subnodes
+    """
+    children_start_lines = {v.start_position() for v in pet.subtree_of_type(root, NodeType.LOOP)}
+    return [v for v in pet.direct_children(root) if is_pipeline_subnode(root, v, children_start_lines)]
+
+
+def is_pipeline_subnode(root: CUNode, current: CUNode, children_start_lines: Set[str]) -> bool:
     """Checks if node is a valid subnode for pipeline
 
     :param root: root node
@@ -144,31 +154,32 @@ def __detect_pipeline(pet: PETGraphX, root: CUNode) -> float:
     :return: Pipeline scalar value
     """
 
-    children_start_lines = [v.start_position() for v in pet.subtree_of_type(root, NodeType.LOOP)]
-
-    loop_subnodes = [pet.node_at(t) for s, t, d in pet.out_edges(root.id, EdgeType.CHILD)
-                     if is_pipeline_subnode(root, pet.node_at(t), children_start_lines)]
+    loop_subnodes = get_pipeline_subnodes(pet, root)
 
     # No chain of stages found
     if len(loop_subnodes) < 2:
         return 0
 
-    graph_vector = []
-    for i in range(0, len(loop_subnodes) - 1):
-        graph_vector.append(1.0 if pet.depends_ignore_readonly(loop_subnodes[i + 1], loop_subnodes[i], root) else 0.0)
+    # dependencies between the stages, only the subdiagonal and the upper triangle are needed
+    n = len(loop_subnodes)
+    depends = np.zeros((n, n), dtype=bool)
+    for i in range(1, n):
+        depends[i, i - 1] = pet.depends_ignore_readonly(loop_subnodes[i], loop_subnodes[i - 1], root)
+    for row, col in zip(*np.triu_indices(n, 1)):
+        depends[row, col] = pet.depends_ignore_readonly(loop_subnodes[row], loop_subnodes[col], root)
+
+    graph_vector = depends.diagonal(-1).astype(float).tolist()
 
     pipeline_vector = []
     for i in range(0, len(loop_subnodes) - 1):
         pipeline_vector.append(1.0)
 
-    min_weight = 1.0
-    for i in range(0, len(loop_subnodes) - 1):
-        for j in range(i + 1, len(loop_subnodes)):
-            if pet.depends_ignore_readonly(loop_subnodes[i], loop_subnodes[j], root):
-                # TODO whose corresponding entry in the graph matrix is nonzero?
-                node_weight = 1 - (j - i) / (len(loop_subnodes) - 1)
-                if min_weight > node_weight > 0:
-                    min_weight = node_weight
+    # weight of a dependency from stage i to a later stage j is 1 - (j - i) / (n - 1)
+    # TODO whose corresponding entry in the graph matrix is nonzero?
+    rows, cols = np.nonzero(np.triu(depends, 1))
+    node_weights = 1 - (cols - rows) / (n - 1)
+    node_weights = node_weights[node_weights > 0]
+    min_weight = float(node_weights.min()) if node_weights.size else 1.0
 
     if min_weight == 1.0:
         graph_vector.append(0.0)
@@ -7,11 +7,12 @@
 # directory for details.
 
 
+import itertools
 from typing import List
 
 from .PatternInfo import PatternInfo
 from ..PETGraphX import PETGraphX, NodeType, CUNode
-from ..utils import is_reduction_var, classify_loop_variables
+from ..utils import classify_loop_variables
 
 
 class ReductionInfo(PatternInfo):
@@ -69,9 +70,7 @@ def __detect_reduction(pet: PETGraphX, root: CUNode) -> bool:
     :param root: the loop node
     :return: true if is reduction loop
     """
-    all_vars = []
-    for node in pet.subtree_of_type(root, NodeType.CU):
-        all_vars.extend(node.local_vars)
-        all_vars.extend(node.global_vars)
-
-    return bool([v for v in all_vars if is_reduction_var(root.start_position(), v.name, pet.reduction_vars)])
+    line = root.start_position()
+    return any(pet.is_reduction_var(line, v.name)
+               for node in pet.subtree_of_type(root, NodeType.CU)
+               for v in itertools.chain(node.local_vars, node.global_vars))
@@ -1,7 +1,8 @@
 from copy import deepcopy
 from typing import List
 
-from ..PETGraphX import PETGraphX, NodeType, CUNode, EdgeType
+from ..PETGraphX import PETGraphX, NodeType, CUNode
+from ..pattern_detectors.pipeline_detector import get_pipeline_subnodes
 from ..utils import correlation_coefficient
 
 total = 0
@@ -36,10 +37,7 @@ def check_pipeline(pet: PETGraphX, root: CUNode):
     global before
     global after
 
-    children_start_lines = [v.start_position() for v in pet.subtree_of_type(root, NodeType.LOOP)]
-
-    loop_subnodes = [pet.node_at(t) for s, t, d in pet.out_edges(root.id, EdgeType.CHILD)
-                     if is_pipeline_subnode(root, pet.node_at(t), children_start_lines)]
+    loop_subnodes = get_pipeline_subnodes(pet, root)
 
     if len(loop_subnodes) < 3:
         return
@@ -93,15 +91,14 @@ def delete_lines(matrix, loop_nodes, lines):
 
 
 def get_independent_lines(matrix):
-    res = []
+    # the check is symmetric, so every pair of lines is visited once
+    dependent = set()
     for i in range(0, len(matrix)):
-        indep = True
-        for j in range(0, len(matrix)):
-            if i != j and (matrix[i][j] != 0 or matrix[j][i] != 0):
-                indep = False
-        if indep:
-            res.append(i)
-    return res
+        for j in range(i + 1, len(matrix)):
+            if matrix[i][j] != 0 or matrix[j][i] != 0:
+                dependent.add(i)
+                dependent.add(j)
+    return [i for i in range(0, len(matrix)) if i not in dependent]
 
 
 def get_mergeable_nodes(matrix):
@@ -151,19 +148,3 @@ def get_correlation_coefficient(matrix):
         pipeline_vector.append(min_weight)
     return round(correlation_coefficient(graph_vector, pipeline_vector), 2)
 
-
-def is_pipeline_subnode(root: CUNode, current: CUNode, children_start_lines: List[str]) -> bool:
-    """Checks if node is a valid subnode for pipeline
-
-    :param root: root node
-    :param current: current node
-    :param children_start_lines: start lines of children loops
-    :return: true if valid
-    """
-    r_start = root.start_position()
-    r_end = root.end_position()
-    c_start = current.start_position()
-    c_end = current.end_position()
-    return not (c_start == r_start and c_end == r_start
-                or c_start == r_end and c_end == r_end
-                or c_start == c_end and c_start in children_start_lines)
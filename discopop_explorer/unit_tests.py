@@ -1,10 +1,13 @@
 import json
 import os
 import unittest
+from collections import Counter
 from pathlib import Path
 
 from . import run
+from .PETGraphX import PETGraphX, EdgeType, DepType, NodeType
 from .json_serializer import PatternInfoSerializer
+from .parser import parse_inputs
 
 
 class GraphAnalyzerTest(unittest.TestCase):
@@ -31,6 +34,41 @@ class GraphAnalyzerTest(unittest.TestCase):
                     print('##end##')
                 self.assertTrue(equal, 'Expected and actual detection result are not equal')
 
+    def test_remove_nodes(self):
+        path = Path(__file__).parent.parent / 'test'
+        for file in [f.name for f in os.scandir(path) if f.name.endswith('.json')]:
+            with self.subTest(file=file):
+                data = os.path.join(path, file[:-5], 'data')
+                pet = PETGraphX(*parse_inputs(os.path.join(data, 'Data.xml'),
+                                              os.path.join(data, 'dp_run_dep.txt'),
+                                              os.path.join(data, 'loop_counter_output.txt'),
+                                              os.path.join(data, 'reduction.txt')))
+                nodes = pet.all_nodes()
+                removed = {n.id for n in nodes if n.type == NodeType.DUMMY} | {n.id for n in nodes[::5]}
+                pet.remove_nodes(removed)
+
+                for etype in EdgeType:
+                    out_edges = []
+                    for s, edges in pet._out_edges[etype].items():
+                        self.assertTrue(all(e[0] == s for e in edges))
+                        out_edges.extend(edges)
+                    in_edges = []
+                    for t, edges in pet._in_edges[etype].items():
+                        self.assertTrue(all(e[1] == t for e in edges))
+                        in_edges.extend(edges)
+                    self.assertEqual(Counter(out_edges), Counter(in_edges))
+                    for s, t, d in out_edges:
+                        self.assertNotIn(s, removed)
+                        self.assertNotIn(t, removed)
+
+                data_edges = [e for edges in pet._out_edges[EdgeType.DATA].values() for e in edges]
+                raw_edges = [e for edges in pet._raw_out_edges.values() for e in edges]
+                self_raw_edges = [e for edges in pet._self_raw_deps.values() for e in edges]
+                self.assertEqual(Counter(raw_edges), Counter(e for e in data_edges if e[2].dtype == DepType.RAW))
+                self.assertEqual(Counter(self_raw_edges),
+                                 Counter(e for e in data_edges
+                                         if e[2].dtype == DepType.RAW and e[2].sink == e[2].source))
+
 
 def ordered(obj):
     if isinstance(obj, dict):
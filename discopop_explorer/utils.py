@@ -8,6 +8,7 @@
 
 
 import itertools
+import math
 from typing import List, Set, Dict, Tuple
 
 import numpy as np
@@ -25,8 +26,11 @@ def correlation_coefficient(v1: List[float], v2: List[float]) -> float:
     :param v2: second vector
     :return: correlation coefficient, 0 if one of the norms is 0
     """
-    norm_product = np.linalg.norm(v1) * np.linalg.norm(v2)  # type:ignore
-    return 0 if norm_product == 0 else np.dot(v1, v2) / norm_product  # type:ignore
+    # convert once, np.linalg.norm and np.dot would convert the lists on every call
+    a = np.asarray(v1, dtype=np.float64)
+    b = np.asarray(v2, dtype=np.float64)
+    norm_product = math.sqrt(a.dot(a)) * math.sqrt(b.dot(b))
+    return 0 if norm_product == 0 else float(a.dot(b)) / norm_product
 
 
 def is_loop_index2(pet: PETGraphX, root_loop: CUNode, var_name: str) -> bool:
@@ -37,8 +41,7 @@ def is_loop_index2(pet: PETGraphX, root_loop: CUNode, var_name: str) -> bool:
     :param var_name: name of the variable
     :return: true if variable is index of the loop
     """
-    loops_start_lines = [v.start_position() for v in pet.subtree_of_type(root_loop, NodeType.LOOP)]
-    return pet.is_loop_index(var_name, loops_start_lines, pet.subtree_of_type(root_loop, NodeType.CU))
+    return var_name in pet.loop_index_vars(root_loop)
 
 
 def get_loop_iterations(line: str) -> int:
@@ -49,18 +52,21 @@ def get_loop_iterations(line: str) -> int:
     return loop_data.get(line, 0)
 
 
-def __get_dep_of_type(pet: PETGraphX, node: CUNode, dep_type: DepType,
-                      reversed: bool) -> List[Tuple[str, str, Dependency]]:
-    """Searches all dependencies of specified type
+def __get_deps_by_type(pet: PETGraphX, nodes: List[CUNode],
+                       reversed: bool) -> Dict[DepType, Set[Tuple[str, str, Dependency]]]:
+    """Collects dependencies of the nodes grouped by dependency type in a single pass
 
     :param pet: CU graph
-    :param node: node
-    :param dep_type: type of dependency
+    :param nodes: nodes
     :param reversed: if true the it looks for incoming dependencies
-    :return: list of dependencies
+    :return: dependencies for each dependency type
     """
-    return [e for e in (pet.in_edges(node.id, EdgeType.DATA) if reversed else pet.out_edges(node.id, EdgeType.DATA))
-            if e[2].dtype == dep_type]
+    deps: Dict[DepType, Set[Tuple[str, str, Dependency]]] = {dep_type: set() for dep_type in DepType}
+    for node in nodes:
+        for e in (pet.in_edges(node.id, EdgeType.DATA) if reversed else pet.out_edges(node.id, EdgeType.DATA)):
+            assert e[2].dtype is not None
+            deps[e[2].dtype].add(e)
+    return deps
 
 
 def __get_variables(nodes: List[CUNode]) -> Set[Variable]:
@@ -78,32 +84,6 @@ def __get_variables(nodes: List[CUNode]) -> Set[Variable]:
     return res
 
 
-def is_reduction_var(line: str, name: str, reduction_vars: List[Dict[str, str]]) -> bool:
-    """Determines, whether or not the given variable is reduction variable
-
-    :param line: loop line number
-    :param name: variable name
-    :param reduction_vars: List of reduction variables
-    :return: true if is reduction variable
-    """
-    return any(rv for rv in reduction_vars if rv['loop_line'] == line and rv['name'] == name)
-
-
-def is_reduction_any(possible_lines: List[str], name: str, reduction_vars: List[Dict[str, str]]) -> bool:
-    """Determines, whether or not the given variable is reduction variable
-
-    :param possible_lines: possible loop line number
-    :param name: variable name
-    :param reduction_vars: List of reduction variables
-    :return: true if is reduction variable
-    """
-    for line in possible_lines:
-        if is_reduction_var(line, name, reduction_vars):
-            return True
-
-    return False
-
-
 def is_written_in_subtree(var_name: str, raw: Set[Tuple[str, str, Dependency]],
                           waw: Set[Tuple[str, str, Dependency]], tree: List[CUNode]) -> bool:
     """ Checks if variable is written in subtree
@@ -114,8 +94,9 @@ def is_written_in_subtree(var_name: str, raw: Set[Tuple[str, str, Dependency]],
     :param tree: subtree
     :return: true if is written
     """
+    tree_ids = {n.id for n in tree}
     for e in itertools.chain(raw, waw):
-        if e[2].var_name == var_name and any([n.id == e[1] for n in tree]):
+        if e[2].var_name == var_name and e[1] in tree_ids:
             return True
     return False
 
@@ -154,22 +135,6 @@ def is_scalar_val(var) -> bool:
     return not (var.type.endswith('**') or var.type.startswith('ARRAY' or var.type.startswith('[')))
 
 
-def is_readonly(var: str, war: Set[Tuple[str, str, Dependency]],
-                waw: Set[Tuple[str, str, Dependency]], rev_war: Set[Tuple[str, str, Dependency]]) -> bool:
-    """Checks if variable is readonly
-
-    :param var: variable name
-    :param war: war dependencies of the loop
-    :param waw: waw dependencies of the loop
-    :param rev_war: reversed raw dependencies of the loop
-    :return: trie if readonly
-    """
-    for e in itertools.chain(war, waw, rev_war):
-        if e[2].var_name == var:
-            return False
-    return True
-
-
 def is_global(var: str, tree: List[CUNode]) -> bool:
     """Checks if variable is global
 
@@ -197,12 +162,13 @@ def is_first_written(var: str, raw: Set[Tuple[str, str, Dependency]],
     :param sub: subtree of the loop
     :return: true if first written
     """
+    sub_ids = {n.id for n in sub}
     for e in war:
-        if e[2].var_name == var and any([n.id == e[1] for n in sub]):
+        if e[2].var_name == var and e[1] in sub_ids:
             res = False
             for eraw in raw:
                 # TODO check
-                if (eraw[2].var_name == var and any([n.id == e[1] for n in sub])
+                if (eraw[2].var_name == var and e[1] in sub_ids
                         and e[0] == eraw[2].sink):
                     res = True
                     break
@@ -232,14 +198,15 @@ def is_first_written_new(var: Variable, raw_deps: Set[Tuple[str, str, Dependency
     if var.name is None:
         print("Empty var.name found. Skipping.")
         return False
+    tree_ids = {n.id for n in tree}
     for dep in raw_deps:
         assert dep[2].var_name is not None
-        if var.name in dep[2].var_name and any([n.id == dep[1] for n in tree]):
+        if var.name in dep[2].var_name and dep[1] in tree_ids:
             result = True
             for warDep in war_deps:
                 assert warDep[2].var_name is not None
                 if (var.name in warDep[2].var_name
-                        and any([n.id == dep[1] for n in tree])
+                        and dep[1] in tree_ids
                         and dep[2].source == warDep[2].sink):
                     result = False
                     break
@@ -254,8 +221,9 @@ def is_read_in_subtree(var: str, rev_raw: Set[Tuple[str, str, Dependency]], tree
     :param tree: subtree
     :return: true if read in right subtree
     """
+    tree_ids = {n.id for n in tree}
     for e in rev_raw:
-        if e[2].var_name == var and any([n.id == e[1] for n in tree]):
+        if e[2].var_name == var and e[1] in tree_ids:
             return True
     return False
 
@@ -269,11 +237,8 @@ def is_depend_in_out(var: Variable, in_deps: List[Tuple[str, str, Dependency]],
     :param out_deps: out dependencies
     :return: true if dependency is both in and out
     """
-    for in_dep in in_deps:
-        for out_dep in out_deps:
-            if var.name == in_dep[2].var_name and in_dep[2].var_name == out_dep[2].var_name:
-                return True
-    return False
+    return (any(in_dep[2].var_name == var.name for in_dep in in_deps)
+            and any(out_dep[2].var_name == var.name for out_dep in out_deps))
 
 
 def is_depend_in_var(var: Variable, in_deps: List[Tuple[str, str, Dependency]],
@@ -325,13 +290,14 @@ def is_read_in(var: Variable, raw_deps_on: Set[Tuple[str, str, Dependency]],
         # of the loop, then var is read in rst
         if var.name == dep[2].var_name:
             return True
+    tree_ids = {n.id for n in tree}
     for dep in war_deps_on:
-        if var.name == dep[2].var_name and any([n.id == dep[1] for n in tree]):
+        if var.name == dep[2].var_name and dep[1] in tree_ids:
             return True
     for dep in reverse_raw_deps_on:
         # If there is a reverse raw dependency for var and the sink cu is not part
         # of the loop, then var is read in rst
-        if var.name == dep[2].var_name and any([n.id == dep[1] for n in tree]):
+        if var.name == dep[2].var_name and dep[1] in tree_ids:
             return True
     for dep in reverse_war_deps_on:
         if var.name == dep[2].var_name:
@@ -385,16 +351,13 @@ def classify_loop_variables(pet: PETGraphX, loop: CUNode) -> Tuple[List[Variable
 
     vars = __get_variables(sub)
 
-    raw = set()
-    war = set()
-    waw = set()
-    rev_raw = set()
-
-    for sub_node in sub:
-        raw.update(__get_dep_of_type(pet, sub_node, DepType.RAW, False))
-        war.update(__get_dep_of_type(pet, sub_node, DepType.WAR, False))
-        waw.update(__get_dep_of_type(pet, sub_node, DepType.WAW, False))
-        rev_raw.update(__get_dep_of_type(pet, sub_node, DepType.RAW, True))
+    out_deps = __get_deps_by_type(pet, sub, False)
+    raw = out_deps[DepType.RAW]
+    war = out_deps[DepType.WAR]
+    waw = out_deps[DepType.WAW]
+    rev_raw = __get_deps_by_type(pet, sub, True)[DepType.RAW]
+    # variables written inside the loop body
+    written_vars = {e[2].var_name for e in itertools.chain(war, waw, rev_raw)}
 
     for var in vars:
         if is_loop_index2(pet, loop, var.name):
@@ -403,7 +366,7 @@ def classify_loop_variables(pet: PETGraphX, loop: CUNode) -> Tuple[List[Variable
             reduction.append(var)
             # TODO grouping
         elif (is_written_in_subtree(var.name, raw, waw, lst) or is_func_arg(pet, var.name, loop)
-              and is_scalar_val(var)) and is_readonly(var.name, war, waw, rev_raw):
+              and is_scalar_val(var)) and var.name not in written_vars:
             if is_global(var.name, sub):
                 private.append(var)
             else:
@@ -468,25 +431,17 @@ def classify_task_vars(pet: PETGraphX, task: CUNode, type: str, in_deps: List[Tu
     else:
         vars = __get_variables(pet.subtree_of_type(task, NodeType.CU))
 
-    raw_deps_on = set()  # set<Dependence>
-    war_deps_on = set()
-    waw_deps_on = set()
+    # insert all entries from child_cu.RAW_deps_on into RAW_deps_on etc.
+    deps_on = __get_deps_by_type(pet, subtree, False)
+    raw_deps_on = deps_on[DepType.RAW]  # set<Dependence>
+    war_deps_on = deps_on[DepType.WAR]
+    waw_deps_on = deps_on[DepType.WAW]
 
-    reverse_raw_deps_on = set()
-    reverse_war_deps_on = set()
-    reverse_waw_deps_on = set()
+    reverse_deps_on = __get_deps_by_type(pet, subtree, True)
+    reverse_raw_deps_on = reverse_deps_on[DepType.RAW]
+    reverse_war_deps_on = reverse_deps_on[DepType.WAR]
     # init = []  # set<String>
 
-    for sub_node in subtree:
-        # insert all entries from child_cu.RAW_deps_on into RAW_deps_on etc.
-        raw_deps_on.update(__get_dep_of_type(pet, sub_node, DepType.RAW, False))
-        war_deps_on.update(__get_dep_of_type(pet, sub_node, DepType.WAR, False))
-        waw_deps_on.update(__get_dep_of_type(pet, sub_node, DepType.WAW, False))
-
-        reverse_raw_deps_on.update(__get_dep_of_type(pet, sub_node, DepType.RAW, True))
-        reverse_war_deps_on.update(__get_dep_of_type(pet, sub_node, DepType.WAR, True))
-        reverse_waw_deps_on.update(__get_dep_of_type(pet, sub_node, DepType.WAW, True))
-
     do_all_loops, reduction_loops = get_child_loops(pet, task)
     # reduction_result = ""
 
@@ -502,19 +457,18 @@ def classify_task_vars(pet: PETGraphX, task: CUNode, type: str, in_deps: List[Tu
 
     loops_start_lines = [n.start_position() for n in loop_nodes]
     loop_children = [c for n in loop_nodes for c in pet.direct_children(n)]
+    raw_dep_vars = {dep[2].var_name for dep in raw_deps_on}
+    # variables written inside the task
+    written_vars = {e[2].var_name for e in itertools.chain(war_deps_on, waw_deps_on, reverse_raw_deps_on)}
 
     for var in vars:
-        var_is_loop_index = False
-        # get RAW dependencies for var
-        tmp_deps = [dep for dep in raw_deps_on if dep[2].var_name == var.name]
-        for edge in tmp_deps:
-            if pet.is_loop_index(edge[2].var_name, loops_start_lines, loop_children):
-                var_is_loop_index = True
-                break
+        # every RAW dependency for var asks the same question, so check it once
+        var_is_loop_index = (var.name in raw_dep_vars
+                             and pet.is_loop_index(var.name, loops_start_lines, loop_children))
         if var_is_loop_index:
             private.append(var)
         elif (("GeometricDecomposition" in type or "Pipeline" in type)
-              and is_reduction_any(loops_start_lines, var.name, pet.reduction_vars)):
+              and any(pet.is_reduction_var(line, var.name) for line in loops_start_lines)):
             reduction.append(var.name)
         elif is_depend_in_out(var, in_deps, out_deps):
             depend_in_out.append(var)
@@ -524,7 +478,7 @@ def classify_task_vars(pet: PETGraphX, task: CUNode, type: str, in_deps: List[Tu
             depend_out.append(var)
         elif ((is_written_in_subtree(var.name, raw_deps_on, waw_deps_on, left_sub_tree) or
                (is_func_arg(pet, var.name, task) and is_scalar_val(var))) and
-              is_readonly(var.name, war_deps_on, waw_deps_on, reverse_raw_deps_on)):
+              var.name not in written_vars):
             if is_global(var.name, subtree):
                 shared.append(var)
             else: